@@ -21,7 +21,10 @@ Target Table:
 
 Dependencies:
     - requests
-    - pandas
+    - requests-cache
+    - orjson
+    - pandas (>= 2.0)
+    - pyarrow
     - sqlalchemy
     - psycopg2
 
@@ -33,17 +36,35 @@ Execution:
 # Standard Library Imports
 # ============================================================
 
-import time
+import math
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 # ============================================================
 # Third-Party Library Imports
 # ============================================================
 
+import orjson
 import requests
+from urllib3.util import Retry
 import pandas as pd
-from sqlalchemy import create_engine, text
 from config import settings
+from ingest_common import (
+    RateLimiter,
+    build_session,
+    cast_dtypes,
+    check_table_columns,
+    create_load_engine,
+    dedup_frames,
+    load_dataframe,
+    setup_queue_logging
+)
+
+# Page-level progress is logged at DEBUG on this module's logger only
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
 
 # ============================================================
 # Boston ZIP → Neighborhood Mapping
@@ -95,22 +116,54 @@ HEADERS = {
     "x-rapidapi-key": API_KEY
 }
 
+# Number of ZIP codes fetched concurrently (network-bound)
+MAX_WORKERS = 8
+
+# Upper bound on in-flight API requests across all worker threads
+MAX_IN_FLIGHT = 4
+REQUEST_SLOTS = threading.BoundedSemaphore(MAX_IN_FLIGHT)
+
+# Minimum spacing (seconds) between network requests across all threads;
+# caps request rate, which the in-flight bound alone does not
+REQUEST_INTERVAL = 0.2
+
+# Shared pool for fetching pages 2..n of a ZIP once its page count is known
+PAGE_WORKERS = 4
+PAGE_EXECUTOR = ThreadPoolExecutor(max_workers=PAGE_WORKERS)
+
+# Transport-level retry policy: exponential backoff on rate limits and
+# gateway errors (a 429's Retry-After header is honoured)
+RETRY_POLICY = Retry(
+    total=3,
+    backoff_factor=2,
+    status_forcelist=(429, 502, 503, 504),
+    allowed_methods=("GET",)
+)
+
+# Cached session with a keep-alive pool shared by all worker threads;
+# re-runs within the cache window skip the API
+SESSION = build_session(
+    ".redfin_cache",
+    RateLimiter(REQUEST_INTERVAL),
+    pool_size=16,
+    retries=RETRY_POLICY
+)
+
 # ============================================================
 # API Fetching Utilities
 # ============================================================
 
-def fetch_redfin_listings(zipcode: str, page: int, max_retries: int = 3, backoff_factor: int = 2):
+def fetch_redfin_listings(zipcode: str, page: int):
     """
     Fetch a single page of rental listings from the Redfin API.
 
-    Implements retry logic with exponential backoff to safely recover
-    from transient network failures and gateway timeouts.
+    Timeouts, rate limits and gateway errors are retried with exponential
+    backoff by the session's RETRY_POLICY before an exception reaches this
+    function.
 
     Args:
         zipcode (str): 5-digit ZIP code to query.
         page (int): Page number for paginated results.
-        max_retries (int): Number of retry attempts on failure.
-        backoff_factor (int): Multiplier for wait time between retries.
 
     Returns:
         tuple:
@@ -122,71 +175,72 @@ def fetch_redfin_listings(zipcode: str, page: int, max_retries: int = 3, backoff
         "page": page
     }
 
-    for attempt in range(1, max_retries + 1):
-        try:
-            response = requests.get(BASE_URL, headers=HEADERS, params=params, timeout=30)
-            response.raise_for_status()
-            json_data = response.json()
-            results = json_data.get("data", [])
-            total_count = json_data.get("totalResultCount", 0)
-            return results, total_count
-
-        except requests.exceptions.ReadTimeout:
-            wait_time = backoff_factor * attempt
-            print(
-                f"Timeout fetching {zipcode} (page {page}). "
-                f"Retrying in {wait_time}s... (Attempt {attempt}/{max_retries})"
-            )
-            time.sleep(wait_time)
-
-        except requests.exceptions.HTTPError as e:
-            if response.status_code == 504:
-                wait_time = backoff_factor * attempt
-                print(
-                    f"504 Gateway Timeout for {zipcode} page {page}. "
-                    f"Retrying in {wait_time}s..."
-                )
-                time.sleep(wait_time)
-                continue
-            else:
-                print(f"HTTP error {response.status_code} for {zipcode}: {e}")
-                return [], 0
-
-        except requests.exceptions.RequestException as e:
-            print(f"Request failed for {zipcode} (page {page}): {e}")
-            return [], 0
-
-    print(f"Max retries exceeded for {zipcode} (page {page}). Skipping.")
-    return [], 0
+    try:
+        with REQUEST_SLOTS:
+            response = SESSION.get(BASE_URL, headers=HEADERS, params=params, timeout=30)
+        response.raise_for_status()
+        json_data = orjson.loads(response.content)
+        results = json_data.get("data", [])
+        total_count = json_data.get("totalResultCount", 0)
+        return results, total_count
 
-# ============================================================
-# Safe JSON Access Utility
-# Prevents KeyErrors in nested objects
-# ============================================================
+    except requests.exceptions.RetryError as e:
+        print(f"Max retries exceeded for {zipcode} (page {page}). Skipping. ({e})")
+        return [], 0
 
-def safe_get(obj, *keys):
-    """
-    Safely traverse nested dictionaries using a variable list of keys.
+    except requests.exceptions.HTTPError as e:
+        print(f"HTTP error {response.status_code} for {zipcode}: {e}")
+        return [], 0
 
-    Args:
-        obj (dict): Source dictionary.
-        *keys: Arbitrary depth of nested keys.
-
-    Returns:
-        Any: Value at nested path or None if missing.
-    """
-    for key in keys:
-        if isinstance(obj, dict):
-            obj = obj.get(key)
-        else:
-            return None
-    return obj
+    except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
+        print(f"Request failed for {zipcode} (page {page}): {e}")
+        return [], 0
 
 # ============================================================
 # Raw Listing Normalization
 # ============================================================
 
-def parse_listing(item: dict) -> dict:
+REDFIN_URL_PREFIX = "https://www.redfin.com"
+
+# Flat record column order; parse_listing returns tuples in this order
+COLS = (
+    "listing_id",
+    "price_min",
+    "price_max",
+    "beds_min",
+    "beds_max",
+    "baths_min",
+    "baths_max",
+    "sqft_min",
+    "sqft_max",
+    "zip_code",
+    "latitude",
+    "longitude",
+    "address_line",
+    "url"
+)
+
+# Analytics-safe, PyArrow-backed dtypes applied to each ZIP frame before concat;
+# keys are the authoritative raw-table columns, checked at startup
+DTYPES = {
+    "listing_id": "string[pyarrow]",
+    "price_min": "int32[pyarrow]",
+    "price_max": "int32[pyarrow]",
+    "beds_min": "float32[pyarrow]",
+    "beds_max": "float32[pyarrow]",
+    "baths_min": "float32[pyarrow]",
+    "baths_max": "float32[pyarrow]",
+    "sqft_min": "int32[pyarrow]",
+    "sqft_max": "int32[pyarrow]",
+    "zip_code": "string[pyarrow]",
+    "latitude": "float32[pyarrow]",
+    "longitude": "float32[pyarrow]",
+    "address_line": "string[pyarrow]",
+    "url": "string[pyarrow]",
+    "neighborhood": "string[pyarrow]"
+}
+
+def parse_listing(item: dict) -> tuple:
     """
     Normalize a raw Redfin API listing into a flat relational schema.
 
@@ -194,29 +248,34 @@ def parse_listing(item: dict) -> dict:
         item (dict): Raw listing JSON object.
 
     Returns:
-        dict: Cleaned listing record.
+        tuple: Cleaned listing record in COLS order.
     """
-    homeData = safe_get(item, "homeData") or {}
-    rentalExtension = safe_get(item, "rentalExtension") or {}
-    addr = safe_get(homeData, "addressInfo") or {}
-    coords = safe_get(addr, "centroid", "centroid") or {}
-
-    return {
-        "listing_id": rentalExtension.get("rentalId"),
-        "price_min": rentalExtension.get("rentPriceRange", {}).get("min"),
-        "price_max": rentalExtension.get("rentPriceRange", {}).get("max"),
-        "beds_min": rentalExtension.get("bedRange", {}).get("min"),
-        "beds_max": rentalExtension.get("bedRange", {}).get("max"),
-        "baths_min": rentalExtension.get("bathRange", {}).get("min"),
-        "baths_max": rentalExtension.get("bathRange", {}).get("max"),
-        "sqft_min": rentalExtension.get("sqftRange", {}).get("min"),
-        "sqft_max": rentalExtension.get("sqftRange", {}).get("max"),
-        "zip_code": addr.get("zip"),
-        "latitude": coords.get("latitude"),
-        "longitude": coords.get("longitude"),
-        "address_line": addr.get("formattedStreetLine"),
-        "url": "https://www.redfin.com" + homeData.get("url", "")
-    }
+    # Bind each nested object once; `or {}` guards against nulls
+    homeData = item.get("homeData") or {}
+    rentalExtension = item.get("rentalExtension") or {}
+    addr = homeData.get("addressInfo") or {}
+    coords = (addr.get("centroid") or {}).get("centroid") or {}
+    rpr = rentalExtension.get("rentPriceRange") or {}
+    beds = rentalExtension.get("bedRange") or {}
+    baths = rentalExtension.get("bathRange") or {}
+    sqft = rentalExtension.get("sqftRange") or {}
+
+    return (
+        rentalExtension.get("rentalId"),
+        rpr.get("min"),
+        rpr.get("max"),
+        beds.get("min"),
+        beds.get("max"),
+        baths.get("min"),
+        baths.get("max"),
+        sqft.get("min"),
+        sqft.get("max"),
+        addr.get("zip"),
+        coords.get("latitude"),
+        coords.get("longitude"),
+        addr.get("formattedStreetLine"),
+        homeData.get("url")
+    )
 
 # ============================================================
 # ZIP-Level Extraction, Cleaning & Enrichment
@@ -233,105 +292,99 @@ def fetch_and_clean_zip(zipcode: str) -> pd.DataFrame:
     Returns:
         pd.DataFrame: Cleaned ZIP-level dataset.
     """
-    listings = []
-    page = 1
-    total_count = None
-
-    while True:
-        results, count = fetch_redfin_listings(zipcode, page)
+    # Page 1 reveals the total result count and the API page size
+    results, total_count = fetch_redfin_listings(zipcode, 1)
+    logger.debug("Total expected listings for %s: %d", zipcode, total_count)
 
-        if total_count is None:
-            total_count = count
-            print(f"Total expected listings for {zipcode}: {total_count}")
+    listings = [parse_listing(item) for item in results]
+    logger.debug("Fetched %d listings from %s (page %d)", len(results), zipcode, 1)
 
-        if not results:
-            print(f"No more data returned for {zipcode}. Exiting loop.")
-            break
+    page_size = len(results)
 
-        for item in results:
-            listings.append(parse_listing(item))
+    if page_size and total_count > page_size:
+        n_pages = math.ceil(total_count / page_size)
 
-        print(f"Fetched {len(results)} listings from {zipcode} (page {page})")
+        # Remaining pages are independent; fetch them concurrently
+        futures = [
+            PAGE_EXECUTOR.submit(fetch_redfin_listings, zipcode, page)
+            for page in range(2, n_pages + 1)
+        ]
 
-        # Exit loop once all known results are fetched
-        if len(listings) >= total_count:
-            print(f"All {total_count} listings retrieved for {zipcode}.")
-            break
+        for page, future in enumerate(futures, start=2):
+            page_results, _ = future.result()
+            listings.extend(parse_listing(item) for item in page_results)
+            logger.debug("Fetched %d listings from %s (page %d)", len(page_results), zipcode, page)
 
-        page += 1
-        time.sleep(0.2)  # Lightweight rate limiting
+    logger.debug("Retrieved %d of %d listings for %s.", len(listings), total_count, zipcode)
 
-    df = pd.DataFrame(listings)
+    df = pd.DataFrame.from_records(listings, columns=list(COLS))
 
     if df.empty:
         print(f"No data fetched for {zipcode}. Skipping normalization.")
         return df
 
+    # Sanitize ZIP as 5-digit string in one vectorized pass
+    df["zip_code"] = df["zip_code"].astype("string").str.slice(0, 5).str.strip()
+
     # Enrich listings with Boston neighborhood using ZIP mapping
     df["neighborhood"] = df["zip_code"].map(BOS_ZIP_TO_NEIGHBORHOOD)
 
-    return df
+    # Apply analytics-safe data types on the small per-ZIP frame
+    return cast_dtypes(df, DTYPES)
 
 # ============================================================
 # Main Execution Block
 # ============================================================
 
-if __name__ == "__main__":
+def main(engine=None) -> None:
+    """
+    Fetch all Boston ZIP codes and reload raw.bos_redfin_listings_raw.
+
+    Args:
+        engine: Optional shared SQLAlchemy engine; defaults to create_load_engine().
+
+    Returns:
+        None
+    """
+    setup_queue_logging()
 
-    # Aggregate all ZIP-level datasets into a master DataFrame
-    master_df = pd.DataFrame()
+    # Fail fast if the raw table no longer matches the parsed schema
+    engine = engine or create_load_engine()
+    check_table_columns("bos_redfin_listings_raw", DTYPES, engine=engine)
 
-    for zip_code in BOS_ZIP_TO_NEIGHBORHOOD.keys():
-        df_zip = fetch_and_clean_zip(zip_code)
-        print(f"{zip_code}: {len(df_zip)} listings fetched")
-        master_df = pd.concat([master_df, df_zip], ignore_index=True)
-        time.sleep(1)  # Cross-ZIP throttling
+    # Fetch all ZIP codes concurrently (I/O-bound); map preserves ZIP order
+    zip_codes = list(BOS_ZIP_TO_NEIGHBORHOOD)
+
+    def report(results):
+        for zip_code, df_zip in zip(zip_codes, results):
+            print(f"{zip_code}: {len(df_zip)} listings fetched")
+            yield df_zip
+
+    # Deduplicate listings across ZIP codes before they reach the master frame
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        results = executor.map(fetch_and_clean_zip, zip_codes)
+        frames = dedup_frames(report(results))
+
+    # Never reload over the previous snapshot with an empty dataset
+    # (exhausted quota, auth failure, or retries spent on every page)
+    if not frames:
+        raise RuntimeError("No listings fetched for any ZIP code; bos_redfin_listings_raw left unchanged")
+
+    # Aggregate all ZIP-level datasets into a master DataFrame (single concat)
+    master_df = pd.concat(frames, ignore_index=True, copy=False)
 
     print(f"Total Listings Fetched: {len(master_df)}")
 
-    # Enforce string type for deduplication
-    master_df["listing_id"] = master_df["listing_id"].astype(str)
-
-    # Deduplicate listings across ZIP codes
-    master_df = master_df.drop_duplicates(subset="listing_id", keep="first")
-
-    # Apply analytics-safe data types
-    master_df = master_df.astype({
-        "listing_id": "string",
-        "price_min": "Int32",
-        "price_max": "Int32",
-        "beds_min": "float32",
-        "beds_max": "float32",
-        "baths_min": "float32",
-        "baths_max": "float32",
-        "sqft_min": "Int32",
-        "sqft_max": "Int32",
-        "zip_code": "string",
-        "latitude": "float32",
-        "longitude": "float32",
-        "address_line": "string",
-        "url": "string",
-        "neighborhood": "string"
-    }, errors="ignore")
+    # Frames carry only URL paths until here; build canonical URLs in one pass
+    master_df["url"] = (REDFIN_URL_PREFIX + master_df["url"].fillna("")).astype(DTYPES["url"])
 
     # ========================================================
     # PostgreSQL (Supabase) Load
     # ========================================================
 
-    engine = create_engine(settings.get_sqlalchemy_url())
+    # Truncate and bulk-load via COPY FROM STDIN in a single transaction
+    load_dataframe(master_df, "bos_redfin_listings_raw", engine=engine)
 
-    # Truncate raw staging table prior to reload
-    with engine.begin() as conn:
-        conn.execute(text("TRUNCATE TABLE raw.bos_redfin_listings_raw"))
-        print("✅ Truncated raw.bos_redfin_listings_raw")
 
-    # Load DataFrame into PostgreSQL
-    master_df.to_sql(
-        "bos_redfin_listings_raw",
-        engine,
-        schema="raw",
-        if_exists="append",
-        index=False
-    )
-
-    print("📥 Data loaded successfully into PostgreSQL.")
+if __name__ == "__main__":
+    main()
@@ -20,6 +20,9 @@ from dotenv import load_dotenv, find_dotenv
 
 load_dotenv(find_dotenv(), override=False)
 
+# SQLAlchemy psycopg2 URL: user, password, host, port, database
+_DB_URL_RE = re.compile(r"postgresql\+psycopg2://([^:]+):([^@]+)@([^:]+):(\d+)/(\S+)")
+
 @dataclass(frozen=True)
 class _Settings:
     # Core
@@ -37,6 +40,9 @@ class _Settings:
     DB_USER: Optional[str] = os.getenv("DB_USER")
     DB_PASSWORD: Optional[str] = os.getenv("DB_PASSWORD")
 
+    # Raw-layer load strategy
+    DB_LOAD_METHOD: str = os.getenv("DB_LOAD_METHOD", "copy")  # copy | insert | adbc | pipeline
+
     def get_sqlalchemy_url(self) -> str:
         """Return a SQLAlchemy-ready PostgreSQL URL."""
         if self.DATABASE_URL:
@@ -48,6 +54,10 @@ class _Settings:
             )
         raise RuntimeError("Database configuration is missing. Set DATABASE_URL or DB_* parts.")
 
+    def get_libpq_url(self) -> str:
+        """Return a libpq-style PostgreSQL URI (no SQLAlchemy driver suffix)."""
+        return re.sub(r"^postgresql\+\w+://", "postgresql://", self.get_sqlalchemy_url())
+
     def get_psycopg2_kwargs(self) -> dict:
         """Return kwargs suitable for psycopg2.connect(**kwargs)."""
         if all([self.DB_HOST, self.DB_PORT, self.DB_NAME, self.DB_USER, self.DB_PASSWORD]):
@@ -59,11 +69,7 @@ class _Settings:
                 "password": self.DB_PASSWORD,
             }
         if self.DATABASE_URL and self.DATABASE_URL.startswith("postgresql"):
-            import re as _re
-            m = _re.match(
-                r"postgresql\+psycopg2://([^:]+):([^@]+)@([^:]+):(\d+)/(\S+)",
-                self.DATABASE_URL
-            )
+            m = _DB_URL_RE.match(self.DATABASE_URL)
             if not m:
                 raise RuntimeError("DATABASE_URL is set but not in expected format for kwargs parsing.")
             user, pwd, host, port, db = m.groups()
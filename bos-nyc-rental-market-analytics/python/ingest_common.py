@@ -0,0 +1,656 @@
+"""
+File: ingest_common.py
+Author: Shankar Veludandi
+Created: 2026-10-14
+Last Updated: 2026-10-14
+
+Description:
+    Source-agnostic building blocks shared by the raw ingestion scripts:
+
+    1. Thread-safe request rate limiting and cached, pooled HTTP sessions
+    2. Vectorized numeric sanitization for mixed string/numeric fields
+       and keep-first listing deduplication across ZIP codes
+    3. Transactional TRUNCATE + bulk load into PostgreSQL (Supabase)
+    4. Queue-backed logging so log I/O stays off the fetch threads
+
+Usage:
+    from ingest_common import RateLimiter, build_session, load_dataframe
+    session = build_session(".realtor_cache", RateLimiter(0.5))
+    load_dataframe(df, "bos_realtor_listings_raw")
+
+Dependencies:
+    - requests
+    - requests-cache
+    - pandas (>= 2.0)
+    - pyarrow
+    - sqlalchemy
+    - psycopg2
+    - adbc-driver-postgresql (optional, DB_LOAD_METHOD=adbc)
+    - psycopg[binary] >= 3.1 (optional, DB_LOAD_METHOD=pipeline)
+"""
+
+# ============================================================
+# Standard Library Imports
+# ============================================================
+
+import io
+import os
+import re
+import time
+import queue
+import atexit
+import logging
+import datetime
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+# ============================================================
+# Third-Party Library Imports
+# ============================================================
+
+import pandas as pd
+import pyarrow as pa
+from psycopg2.extras import execute_values
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+from requests_cache import CachedSession
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy import types as sqltypes
+from sqlalchemy.exc import NoSuchTableError
+from config import settings
+
+# ============================================================
+# Background Logging
+# Records are queued by worker threads and written by one listener thread
+# ============================================================
+
+# Pipeline log directory shared with rental_pipeline.py
+LOG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs")
+
+LOG_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+
+_LOG_LISTENER = None
+_LOG_LOCK = threading.Lock()
+
+def setup_queue_logging(logfile: Optional[str] = None, level: int = logging.INFO) -> None:
+    """
+    Route the root logger through a QueueHandler so file writes happen on
+    a background QueueListener thread instead of in the calling threads.
+
+    Only the first call installs handlers; later calls are no-ops. The root
+    stays at INFO by default so third-party internals (requests-cache,
+    urllib3) stay out of the log; ingest modules raise their own loggers
+    to DEBUG for page-level progress.
+
+    Args:
+        logfile (str): Log file path; defaults to today's pipeline log.
+        level (int): Root logger level.
+
+    Returns:
+        None
+    """
+    global _LOG_LISTENER
+
+    with _LOG_LOCK:
+        if _LOG_LISTENER is not None:
+            return
+
+        if logfile is None:
+            os.makedirs(LOG_DIR, exist_ok=True)
+            logfile = os.path.join(LOG_DIR, f"pipeline_log_{datetime.date.today()}.log")
+
+        file_handler = logging.FileHandler(logfile, encoding="utf-8")
+        file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+        log_queue = queue.Queue()
+        root = logging.getLogger()
+        root.setLevel(level)
+        root.addHandler(QueueHandler(log_queue))
+
+        _LOG_LISTENER = QueueListener(log_queue, file_handler)
+        _LOG_LISTENER.start()
+
+        # Flush queued records before the interpreter exits
+        atexit.register(_LOG_LISTENER.stop)
+
+# ============================================================
+# HTTP Session & Rate Limiting
+# Pooled keep-alive connections shared by all worker threads
+# ============================================================
+
+# Directory holding the on-disk API response caches
+CACHE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Re-runs within this window are served from the cache
+CACHE_EXPIRE_SECONDS = 12 * 3600
+
+# Credential headers/params excluded from cache keys and redacted from stored
+# requests (requests-cache defaults plus the RapidAPI key header)
+CACHE_IGNORED_PARAMS = ["Authorization", "X-API-KEY", "access_token", "api_key", "x-rapidapi-key"]
+
+class RateLimiter:
+    """
+    Thread-safe limiter that spaces outgoing requests at least
+    `interval` seconds apart, keeping global QPS under the RapidAPI cap.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self) -> None:
+        """Block until the calling thread may issue its next request."""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        time.sleep(slot - now)
+
+
+class RateLimitedAdapter(HTTPAdapter):
+    """
+    HTTPAdapter that waits on a RateLimiter before every network send.
+
+    Cached responses never reach the adapter, so they are not throttled.
+    """
+
+    def __init__(self, limiter: RateLimiter, **kwargs):
+        self.limiter = limiter
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        self.limiter.wait()
+        return super().send(request, **kwargs)
+
+
+def build_session(
+    cache_name: str,
+    limiter: Optional[RateLimiter] = None,
+    pool_size: int = 32,
+    retries: Optional[Retry] = None
+) -> CachedSession:
+    """
+    Build a SQLite-cached HTTP session with a pooled (and optionally
+    rate-limited) HTTPS adapter.
+
+    Args:
+        cache_name (str): Cache file name, created under CACHE_DIR.
+        limiter (RateLimiter): Optional limiter applied to network sends.
+        pool_size (int): Keep-alive connections kept per host.
+        retries (Retry): Optional urllib3 retry policy for the adapter.
+
+    Returns:
+        CachedSession: Session shared by all fetch worker threads.
+    """
+    session = CachedSession(
+        os.path.join(CACHE_DIR, cache_name),
+        backend="sqlite",
+        expire_after=CACHE_EXPIRE_SECONDS,
+        allowable_methods=["GET"],
+        ignored_parameters=CACHE_IGNORED_PARAMS
+    )
+
+    adapter_kwargs = {"pool_connections": pool_size, "pool_maxsize": pool_size}
+    if retries is not None:
+        adapter_kwargs["max_retries"] = retries
+
+    if limiter is not None:
+        adapter = RateLimitedAdapter(limiter, **adapter_kwargs)
+    else:
+        adapter = HTTPAdapter(**adapter_kwargs)
+
+    session.mount("https://", adapter)
+    return session
+
+# ============================================================
+# Numeric Field Sanitization
+# Some numeric fields arrive as mixed strings (e.g. "2+")
+# ============================================================
+
+# Leading numeric token, compiled once at import
+_NUM_RE = re.compile(r"(\d+\.?\d*)")
+
+def clean_numeric_column(series: pd.Series) -> pd.Series:
+    """
+    Extracts numeric values from mixed string/numeric fields.
+
+    Already-numeric columns are cast directly, skipping the string pass.
+
+    Args:
+        series (pd.Series): Raw numeric series.
+
+    Returns:
+        pd.Series: Cleaned float32 values.
+    """
+    if pd.api.types.is_numeric_dtype(series):
+        return series.astype("float32")
+
+    return pd.to_numeric(
+        series.astype("string").str.extract(_NUM_RE, expand=False),
+        errors="coerce"
+    ).astype("float32")
+
+
+def cast_dtypes(df: pd.DataFrame, dtypes: dict) -> pd.DataFrame:
+    """
+    Cast a frame to its analytics-safe dtypes.
+
+    Integer targets are coerced explicitly (numeric parse, round, cast), so a
+    single fractional value such as 1999.5 can never leave the whole column
+    as float; COPY would reject its text ("2500.0") for an INTEGER column.
+    All other columns are cast best-effort.
+
+    Args:
+        df (pd.DataFrame): Frame to cast; every dtypes key must be a column.
+        dtypes (dict): Column → target dtype.
+
+    Returns:
+        pd.DataFrame: Frame with target dtypes applied.
+    """
+    int_dtypes = {
+        col: dtype for col, dtype in dtypes.items()
+        if pd.api.types.is_integer_dtype(pd.api.types.pandas_dtype(dtype))
+    }
+
+    df = df.assign(**{
+        col: pd.to_numeric(df[col], errors="coerce").round().astype(dtype)
+        for col, dtype in int_dtypes.items()
+    })
+
+    other_dtypes = {col: dtype for col, dtype in dtypes.items() if col not in int_dtypes}
+    return df.astype(other_dtypes, errors="ignore", copy=False)
+
+# ============================================================
+# Cross-ZIP Deduplication
+# A listing may be returned by several neighbouring ZIP codes
+# ============================================================
+
+def dedup_frames(frames, id_col: str = "listing_id") -> list:
+    """
+    Deduplicate listings across per-ZIP frames, keeping the first occurrence.
+
+    Frames are consumed in iteration order, so the region kept for a shared
+    listing never depends on thread timing. Rows with a null ID are dropped:
+    listing_id is the primary key, and a NULL would abort the whole COPY.
+
+    Args:
+        frames: Iterable of per-ZIP DataFrames, in ZIP order.
+        id_col (str): Listing ID column.
+
+    Returns:
+        list: Non-empty, deduplicated frames ready for pd.concat.
+    """
+    seen_ids: set[str] = set()
+    kept = []
+
+    for df in frames:
+        # Skip empty frames to avoid dtype-coercion churn in concat
+        if df.empty:
+            continue
+
+        listing_ids = df[id_col].astype(str)
+        is_new = df[id_col].notna() & ~listing_ids.isin(seen_ids) & ~listing_ids.duplicated()
+        seen_ids.update(listing_ids[is_new])
+
+        if is_new.any():
+            kept.append(df[is_new])
+
+    return kept
+
+# ============================================================
+# PostgreSQL Bulk Load Utilities
+# ============================================================
+
+# Rows CSV-encoded per chunk while streaming COPY input
+COPY_CHUNK_ROWS = 10000
+
+# Bytes handed to the COPY protocol per read
+COPY_READ_SIZE = 64 * 1024
+
+# Rows per multi-VALUES INSERT statement on the insert fallback
+INSERT_PAGE_SIZE = 1000
+
+def create_load_engine():
+    """
+    Create the SQLAlchemy engine used for standalone raw-layer loads.
+
+    No engine options are needed here: the INSERT fallback batches through
+    psql_insert_values, so this matches the pipeline's shared ENGINE.
+
+    Returns:
+        Engine: SQLAlchemy engine for the configured database.
+    """
+    return create_engine(settings.get_sqlalchemy_url())
+
+
+class CsvChunkStream(io.RawIOBase):
+    """
+    Read-only byte stream that CSV-encodes a DataFrame lazily, one row
+    chunk at a time, so COPY input never exists in memory all at once.
+    """
+
+    def __init__(self, df: pd.DataFrame, chunk_rows: int = COPY_CHUNK_ROWS):
+        self._chunks = (
+            df.iloc[start:start + chunk_rows]
+              .to_csv(index=False, header=False, na_rep="\\N")
+              .encode("utf-8")
+            for start in range(0, len(df), chunk_rows)
+        )
+        self._pending = memoryview(b"")
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        """Fill `b` from the current chunk, encoding the next one on demand."""
+        while not self._pending:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return 0
+            self._pending = memoryview(chunk)
+
+        n = min(len(b), len(self._pending))
+        b[:n] = self._pending[:n]
+        self._pending = self._pending[n:]
+        return n
+
+
+def check_table_columns(table: str, columns, schema: str = "raw", engine=None) -> None:
+    """
+    Verify that a raw table has exactly the columns an ingest writes.
+
+    Run at startup so schema drift fails fast instead of after every ZIP
+    code has been fetched.
+
+    Args:
+        table (str): Target table name.
+        columns: Column names the ingest produces.
+        schema (str): Target schema name.
+        engine: Optional SQLAlchemy engine; defaults to create_load_engine().
+
+    Returns:
+        None
+    """
+    engine = engine or create_load_engine()
+
+    try:
+        table_cols = {col["name"] for col in inspect(engine).get_columns(table, schema=schema)}
+    except NoSuchTableError as e:
+        raise RuntimeError(f"Target table {schema}.{table} does not exist.") from e
+
+    expected = set(columns)
+    if table_cols != expected:
+        raise RuntimeError(
+            f"Column mismatch for {schema}.{table}: "
+            f"missing from table {sorted(expected - table_cols)}, "
+            f"not produced by ingest {sorted(table_cols - expected)}"
+        )
+
+
+def psql_insert_values(table, conn, keys, data_iter) -> None:
+    """
+    DataFrame.to_sql insertion method that batches rows into multi-row
+    INSERT ... VALUES statements via psycopg2's execute_values.
+
+    Args:
+        table: pandas SQLTable being written.
+        conn: SQLAlchemy connection supplied by to_sql.
+        keys (list): Column names in row order.
+        data_iter: Iterable of row tuples for one chunk.
+
+    Returns:
+        None
+    """
+    target = f"{table.schema}.{table.name}" if table.schema else table.name
+    columns = ", ".join(keys)
+
+    with conn.connection.cursor() as cur:
+        execute_values(
+            cur,
+            f"INSERT INTO {target} ({columns}) VALUES %s",
+            list(data_iter),
+            page_size=INSERT_PAGE_SIZE
+        )
+
+
+def copy_dataframe_to_postgres(cursor, df: pd.DataFrame, table: str) -> None:
+    """
+    Bulk-load a DataFrame into PostgreSQL with a single COPY ... FROM STDIN.
+
+    Streams the frame as CSV through a CsvChunkStream in one statement
+    instead of the row-at-a-time INSERTs issued by DataFrame.to_sql;
+    memory stays bounded to one encoded chunk regardless of row count.
+    Runs inside the caller's transaction; committing is left to the caller.
+
+    Args:
+        cursor: psycopg2 cursor on the target database.
+        df (pd.DataFrame): Dataset to load; column names must match the table.
+        table (str): Schema-qualified target table name.
+
+    Returns:
+        None
+    """
+    columns = ", ".join(df.columns)
+    cursor.copy_expert(
+        f"COPY {table} ({columns}) FROM STDIN WITH (FORMAT CSV, NULL '\\N')",
+        CsvChunkStream(df),
+        size=COPY_READ_SIZE
+    )
+
+
+def _arrow_type_for(sql_type) -> pa.DataType:
+    """Map a reflected PostgreSQL column type to the Arrow type that loads into it."""
+    if isinstance(sql_type, sqltypes.BigInteger):
+        return pa.int64()
+    if isinstance(sql_type, sqltypes.SmallInteger):
+        return pa.int16()
+    if isinstance(sql_type, sqltypes.Integer):
+        return pa.int32()
+    if isinstance(sql_type, sqltypes.REAL):
+        return pa.float32()
+    if isinstance(sql_type, sqltypes.Float):
+        return pa.float64()
+    if isinstance(sql_type, sqltypes.Boolean):
+        return pa.bool_()
+    if isinstance(sql_type, sqltypes.DateTime):
+        return pa.timestamp("us")
+    if isinstance(sql_type, sqltypes.Date):
+        return pa.date32()
+    return pa.string()
+
+
+def arrow_schema_for_table(table: str, schema: str = "raw", engine=None) -> pa.Schema:
+    """
+    Build an explicit Arrow schema from a raw table's DDL.
+
+    Args:
+        table (str): Target table name.
+        schema (str): Target schema name.
+        engine: Optional SQLAlchemy engine; defaults to create_load_engine().
+
+    Returns:
+        pa.Schema: One field per table column, in table column order.
+    """
+    engine = engine or create_load_engine()
+    return pa.schema([
+        (col["name"], _arrow_type_for(col["type"]))
+        for col in inspect(engine).get_columns(table, schema=schema)
+    ])
+
+
+def to_arrow_table(df: pd.DataFrame, target_schema: pa.Schema) -> pa.Table:
+    """
+    Convert a DataFrame to an Arrow table cast to the raw table's schema.
+
+    Column types come from the DDL rather than pandas inference, so e.g.
+    whole-valued REAL columns never reach binary COPY as integers.
+    Categorical (dictionary) columns are decoded before the cast, and
+    timestamps may be narrowed to dates for the raw DATE columns.
+
+    Args:
+        df (pd.DataFrame): Dataset to convert; columns must match the table.
+        target_schema (pa.Schema): Schema from arrow_schema_for_table.
+
+    Returns:
+        pa.Table: Arrow table in table column order.
+    """
+    source = pa.Table.from_pandas(df, preserve_index=False)
+    columns = []
+
+    for field in target_schema:
+        column = source.column(field.name)
+        if pa.types.is_dictionary(column.type):
+            column = column.cast(column.type.value_type)
+
+        # Only temporal narrowing (timestamp -> date) may drop information
+        columns.append(column.cast(field.type, safe=not pa.types.is_temporal(field.type)))
+
+    return pa.Table.from_arrays(columns, schema=target_schema)
+
+
+def load_dataframe_adbc(df: pd.DataFrame, table: str, schema: str = "raw", engine=None) -> None:
+    """
+    Replace the contents of a raw staging table via ADBC's Arrow-native
+    binary COPY, skipping CSV text encoding entirely.
+
+    TRUNCATE and ingest share one ADBC transaction.
+
+    Args:
+        df (pd.DataFrame): Dataset to load; column names must match the table.
+        table (str): Target table name.
+        schema (str): Target schema name.
+        engine: Optional SQLAlchemy engine used to reflect the table schema.
+
+    Returns:
+        None
+    """
+    try:
+        import adbc_driver_postgresql.dbapi as adbc_pg
+    except ImportError as e:
+        raise RuntimeError("DB_LOAD_METHOD=adbc requires the adbc-driver-postgresql package.") from e
+
+    qualified = f"{schema}.{table}"
+    arrow_table = to_arrow_table(df, arrow_schema_for_table(table, schema, engine))
+
+    with adbc_pg.connect(settings.get_libpq_url()) as conn:
+        with conn.cursor() as cur:
+            cur.execute(f"TRUNCATE TABLE {qualified}")
+            print(f"✅ Truncated {qualified}")
+
+            cur.adbc_ingest(table, arrow_table, mode="append", db_schema_name=schema)
+
+        conn.commit()
+
+    print("📥 Data loaded successfully into PostgreSQL.")
+
+
+def iter_arrow_rows(arrow_table: pa.Table, batch_rows: int = COPY_CHUNK_ROWS):
+    """
+    Yield Python-native row tuples from an Arrow table, one batch at a time.
+
+    Args:
+        arrow_table (pa.Table): Table to iterate.
+        batch_rows (int): Rows converted to Python objects per batch.
+
+    Yields:
+        tuple: Row values in column order, with None for nulls.
+    """
+    for batch in arrow_table.to_batches(max_chunksize=batch_rows):
+        yield from zip(*batch.to_pydict().values())
+
+
+def load_dataframe_pipeline(df: pd.DataFrame, table: str, schema: str = "raw", engine=None) -> None:
+    """
+    Replace the contents of a raw staging table with prepared INSERTs
+    streamed in psycopg 3 pipeline mode, for servers that disallow COPY.
+
+    Pipeline mode sends the executes back-to-back without waiting for
+    each acknowledgement; psycopg prepares the repeated INSERT server-side.
+    TRUNCATE and inserts share one transaction.
+
+    Args:
+        df (pd.DataFrame): Dataset to load; column names must match the table.
+        table (str): Target table name.
+        schema (str): Target schema name.
+        engine: Optional SQLAlchemy engine used to reflect the table schema.
+
+    Returns:
+        None
+    """
+    try:
+        import psycopg
+    except ImportError as e:
+        raise RuntimeError("DB_LOAD_METHOD=pipeline requires psycopg >= 3.1.") from e
+
+    qualified = f"{schema}.{table}"
+    arrow_table = to_arrow_table(df, arrow_schema_for_table(table, schema, engine))
+
+    columns = ", ".join(arrow_table.column_names)
+    placeholders = ", ".join(["%s"] * arrow_table.num_columns)
+    insert_sql = f"INSERT INTO {qualified} ({columns}) VALUES ({placeholders})"
+
+    with psycopg.connect(settings.get_libpq_url()) as conn:
+        with conn.transaction(), conn.cursor() as cur:
+            cur.execute(f"TRUNCATE TABLE {qualified}")
+            print(f"✅ Truncated {qualified}")
+
+            with conn.pipeline():
+                cur.executemany(insert_sql, iter_arrow_rows(arrow_table))
+
+    print("📥 Data loaded successfully into PostgreSQL.")
+
+
+def load_dataframe(df: pd.DataFrame, table: str, schema: str = "raw", engine=None) -> None:
+    """
+    Replace the contents of a raw staging table with a DataFrame.
+
+    TRUNCATE and load share one transaction, so a failed load never leaves
+    the table empty. Uses COPY unless DB_LOAD_METHOD selects "insert",
+    "adbc" or "pipeline".
+
+    Args:
+        df (pd.DataFrame): Dataset to load; column names must match the table.
+        table (str): Target table name.
+        schema (str): Target schema name.
+        engine: Optional SQLAlchemy engine; defaults to create_load_engine().
+
+    Returns:
+        None
+    """
+    if settings.DB_LOAD_METHOD == "adbc":
+        load_dataframe_adbc(df, table, schema, engine)
+        return
+
+    if settings.DB_LOAD_METHOD == "pipeline":
+        load_dataframe_pipeline(df, table, schema, engine)
+        return
+
+    engine = engine or create_load_engine()
+    qualified = f"{schema}.{table}"
+
+    with engine.begin() as conn:
+        # Skip the WAL fsync wait on commit for this bulk load only
+        conn.execute(text("SET LOCAL synchronous_commit = off"))
+
+        conn.execute(text(f"TRUNCATE TABLE {qualified}"))
+        print(f"✅ Truncated {qualified}")
+
+        if settings.DB_LOAD_METHOD == "insert":
+            # Fallback when COPY is not permitted: batched multi-row INSERTs
+            df.to_sql(
+                table,
+                conn,
+                schema=schema,
+                if_exists="append",
+                index=False,
+                chunksize=10000,
+                method=psql_insert_values
+            )
+        else:
+            # Bulk-load DataFrame into PostgreSQL via COPY
+            with conn.connection.cursor() as cur:
+                copy_dataframe_to_postgres(cur, df, qualified)
+
+    print("📥 Data loaded successfully into PostgreSQL.")
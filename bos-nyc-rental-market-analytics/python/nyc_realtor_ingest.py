@@ -20,31 +20,18 @@ Target Table:
     raw.nyc_realtor_listings_raw
 
 Dependencies:
-    - requests
-    - pandas
-    - sqlalchemy
-    - psycopg2
+    - realtor_common (requests, requests-cache, orjson, pandas, pyarrow,
+      sqlalchemy, psycopg2)
 
 Execution:
     python nyc_realtor_ingest.py
 """
 
-# ============================================================
-# Standard Library Imports
-# ============================================================
-
-import time
-from datetime import datetime
-
 # ============================================================
 # Third-Party Library Imports
 # ============================================================
 
-import requests
-import pandas as pd
-from sqlalchemy import create_engine, text
-from requests.exceptions import HTTPError
-from config import settings
+from realtor_common import RealtorIngest
 
 # ============================================================
 # NYC ZIP Codes Grouped by Borough
@@ -93,264 +80,35 @@ NYC_ZIPS_BY_BOROUGH = {
     ]
 }
 
-# ============================================================
-# Realtor API Configuration (RapidAPI)
-# ============================================================
-
-API_KEY = settings.API_KEY
-if not API_KEY:
-    raise RuntimeError("Missing API_KEY in environment")
-BASE_URL = "https://realtor16.p.rapidapi.com/search/forrent"
-
-HEADERS = {
-    "x-rapidapi-host": "realtor16.p.rapidapi.com",
-    "x-rapidapi-key": API_KEY
+# Flattened ZIP → borough lookup; every queried ZIP is tagged with its borough
+NYC_ZIP_TO_BOROUGH = {
+    zip_code: borough
+    for borough, zip_list in NYC_ZIPS_BY_BOROUGH.items()
+    for zip_code in zip_list
 }
 
 # ============================================================
-# API Fetching Utilities
-# ============================================================
-
-def fetch_realtor_listings(zipcode: str, page: int, max_retries: int = 5, backoff_factor: int = 2):
-    """
-    Fetch a single page of rental listings from the Realtor API.
-
-    Implements retry logic with exponential backoff to safely recover
-    from rate limits, timeouts, and transient network failures.
-
-    Args:
-        zipcode (str): 5-digit ZIP code to query.
-        page (int): Page number for paginated results.
-        max_retries (int): Number of retry attempts on failure.
-        backoff_factor (int): Multiplier for wait time between retries.
-
-    Returns:
-        list: List of raw listing JSON objects.
-    """
-    params = {
-        "location": zipcode,
-        "page": page,
-        "limit": 200
-    }
-
-    for attempt in range(1, max_retries + 1):
-        try:
-            response = requests.get(BASE_URL, headers=HEADERS, params=params, timeout=20)
-            response.raise_for_status()
-            json_data = response.json()
-            return json_data.get("properties", [])
-
-        except requests.exceptions.ReadTimeout:
-            wait_time = backoff_factor * attempt
-            print(
-                f"⏳ Timeout fetching {zipcode} (page {page}). "
-                f"Retrying in {wait_time}s... (Attempt {attempt}/{max_retries})"
-            )
-            time.sleep(wait_time)
-
-        except requests.exceptions.HTTPError as e:
-            status = response.status_code
-            if status in [429, 504]:
-                wait_time = (2 ** attempt) * 5
-                print(
-                    f"⚠️  HTTP {status} for {zipcode} (page {page}). "
-                    f"Waiting {wait_time}s before retry... (Attempt {attempt}/{max_retries})"
-                )
-                time.sleep(wait_time)
-                continue
-            else:
-                print(f"❌ HTTP error {status} for {zipcode} (page {page}): {e}")
-                return []
-
-        except requests.exceptions.RequestException as e:
-            print(f"❌ Request failed for {zipcode} (page {page}): {e}")
-            return []
-
-    print(f"❌ Max retries exceeded for {zipcode} (page {page}). Skipping.")
-    return []
-
-# ============================================================
-# Safe JSON Access Utility
-# Prevents KeyErrors in nested objects
-# ============================================================
-
-def safe_get(obj, *keys):
-    """
-    Safely traverse nested dictionaries using a variable list of keys.
-
-    Args:
-        obj (dict): Source dictionary.
-        *keys: Arbitrary depth of nested keys.
-
-    Returns:
-        Any: Value at nested path or None if missing.
-    """
-    for key in keys:
-        if isinstance(obj, dict):
-            obj = obj.get(key)
-        else:
-            return None
-    return obj
-
-# ============================================================
-# Raw Listing Normalization
+# Main Execution Pipeline
 # ============================================================
 
-def parse_listing(item: dict) -> dict:
+def main(engine=None) -> None:
     """
-    Normalize a raw Realtor API listing into a flat relational schema.
+    Fetch all NYC ZIP codes and reload raw.nyc_realtor_listings_raw.
 
     Args:
-        item (dict): Raw listing JSON object.
+        engine: Optional shared SQLAlchemy engine; defaults to create_load_engine().
 
     Returns:
-        dict: Cleaned listing record.
+        None
     """
-    description = safe_get(item, "description") or {}
-    addr = safe_get(item, "location", "address") or {}
-    coords = safe_get(addr, "coordinate") or {}
-    pet_policy = safe_get(item, "pet_policy") or {}
+    RealtorIngest(
+        table="nyc_realtor_listings_raw",
+        zip_to_region=NYC_ZIP_TO_BOROUGH,
+        region_col="borough",
+        max_retries=5,
+        request_interval=0.5
+    ).run(engine)
 
-    return {
-        "listing_id": item.get("listing_id"),
-        "list_price": item.get("list_price"),
-        "beds": description.get("beds"),
-        "baths": description.get("baths_consolidated"),
-        "sqft": description.get("sqft"),
-        "list_date": item.get("list_date"),
-        "zip_code": addr.get("postal_code"),
-        "latitude": coords.get("lat"),
-        "longitude": coords.get("lon"),
-        "address_line": addr.get("line"),
-        "url": "https://www.realtor.com/rentals/details/" + item.get("permalink", ""),
-        "pet_cats": pet_policy.get("cats"),
-        "pet_dogs": pet_policy.get("dogs")
-    }
-
-# ============================================================
-# ZIP-Level Extraction, Cleaning & Borough Enrichment
-# ============================================================
-
-def fetch_and_clean_zip(zipcode: str, borough: str) -> pd.DataFrame:
-    """
-    Fetches all paginated Realtor rental listings for a ZIP code,
-    normalizes the dataset, and applies borough enrichment.
-
-    Args:
-        zipcode (str): NYC ZIP code.
-        borough (str): Borough name.
-
-    Returns:
-        pd.DataFrame: Cleaned ZIP-level dataset.
-    """
-    listings = []
-    page = 1
-
-    while True:
-        data = fetch_realtor_listings(zipcode, page)
-        if not data:
-            break
-
-        for item in data:
-            rec = parse_listing(item)
-
-            # Sanitize bath values such as "1+"
-            rec["baths"] = (
-                float(rec["baths"].replace("+", "").strip())
-                if rec.get("baths") else None
-            )
-
-            rec["borough"] = borough
-            listings.append(rec)
-
-        print(f"Fetched {len(data)} listings from {zipcode} (page {page})")
-
-        if len(data) < 200:
-            break
-
-        page += 1
-        time.sleep(0.5)  # Rate limiting
-
-    if not listings:
-        print(f"⚠️  No listings found for {zipcode} ({borough}). Skipping.")
-        return pd.DataFrame()
-
-    try:
-        df = pd.DataFrame(listings)
-
-        if "list_date" not in df.columns:
-            df["list_date"] = None
-
-        df["list_date"] = pd.to_datetime(df["list_date"], errors="coerce")
-        return df
-
-    except KeyError as e:
-        print(f"⚠️  Skipping {zipcode} ({borough}) due to missing column: {e}")
-        return pd.DataFrame()
-
-    except Exception as e:
-        print(f"❌ Unexpected error for {zipcode} ({borough}): {e}")
-        return pd.DataFrame()
-
-# ============================================================
-# Main Execution Block
-# ============================================================
 
 if __name__ == "__main__":
-
-    # Aggregate all ZIP-level datasets into a master DataFrame
-    master_df = pd.DataFrame()
-
-    for borough, zip_list in NYC_ZIPS_BY_BOROUGH.items():
-        for zip_code in zip_list:
-            df_zip = fetch_and_clean_zip(zip_code, borough)
-            print(f"{borough} - {zip_code}: {len(df_zip)} listings fetched")
-            master_df = pd.concat([master_df, df_zip], ignore_index=True)
-
-    print(f"Total Listings Fetched: {len(master_df)}")
-
-    # Enforce string type for deduplication
-    master_df["listing_id"] = master_df["listing_id"].astype(str)
-
-    # Deduplicate listings across ZIP codes
-    master_df = master_df.drop_duplicates(subset="listing_id", keep="first")
-
-    # Apply analytics-safe data types
-    master_df = master_df.astype({
-        "listing_id": "string",
-        "list_price": "Int32",
-        "beds": "float32",
-        "baths": "float32",
-        "sqft": "Int32",
-        "list_date": "datetime64[ns]",
-        "zip_code": "string",
-        "latitude": "float32",
-        "longitude": "float32",
-        "address_line": "string",
-        "url": "string",
-        "pet_cats": "boolean",
-        "pet_dogs": "boolean",
-        "borough": "string"
-    }, errors="ignore")
-
-    # ========================================================
-    # PostgreSQL (Supabase) Load
-    # ========================================================
-
-    engine = create_engine(settings.get_sqlalchemy_url())
-
-    # Truncate raw staging table prior to reload
-    with engine.begin() as conn:
-        conn.execute(text("TRUNCATE TABLE raw.nyc_realtor_listings_raw"))
-        print("✅ Truncated raw.nyc_realtor_listings_raw")
-
-    # Load DataFrame into PostgreSQL
-    master_df.to_sql(
-        "nyc_realtor_listings_raw",
-        engine,
-        schema="raw",
-        if_exists="append",
-        index=False
-    )
-
-    print("📥 Data loaded successfully into PostgreSQL.")
+    main()
@@ -0,0 +1,391 @@
+"""
+File: realtor_common.py
+Author: Shankar Veludandi
+Created: 2026-10-14
+Last Updated: 2026-10-14
+
+Description:
+    Shared Realtor API (RapidAPI) ingest used by the Boston and NYC
+    Realtor scripts. A RealtorIngest run performs the following steps:
+
+    1. Fetches every configured ZIP code concurrently
+    2. Streams paginated Realtor rental listings page by page
+    3. Normalizes nested JSON responses into flat records
+    4. Applies region (neighborhood / borough) enrichment
+    5. Deduplicates listings across ZIP codes (first ZIP in order wins)
+    6. Casts all columns to analytics-safe data types
+    7. Loads final dataset into PostgreSQL (Supabase)
+
+Usage:
+    from realtor_common import RealtorIngest
+    RealtorIngest("bos_realtor_listings_raw", BOS_ZIP_TO_NEIGHBORHOOD, "neighborhood").run()
+
+Dependencies:
+    - requests
+    - requests-cache
+    - orjson
+    - pandas (>= 2.0)
+    - pyarrow
+    - sqlalchemy
+    - psycopg2
+"""
+
+# ============================================================
+# Standard Library Imports
+# ============================================================
+
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+# ============================================================
+# Third-Party Library Imports
+# ============================================================
+
+import orjson
+import requests
+import pandas as pd
+from config import settings
+from ingest_common import (
+    RateLimiter,
+    build_session,
+    cast_dtypes,
+    check_table_columns,
+    clean_numeric_column,
+    create_load_engine,
+    dedup_frames,
+    load_dataframe,
+    setup_queue_logging
+)
+
+# Page-level progress is logged at DEBUG on this module's logger only
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+# ============================================================
+# Realtor API Configuration (RapidAPI)
+# ============================================================
+
+API_KEY = settings.API_KEY
+if not API_KEY:
+    raise RuntimeError("Missing API_KEY in environment")
+BASE_URL = "https://realtor16.p.rapidapi.com/search/forrent"
+
+HEADERS = {
+    "x-rapidapi-host": "realtor16.p.rapidapi.com",
+    "x-rapidapi-key": API_KEY
+}
+
+# Listings requested per page (API maximum)
+PAGE_LIMIT = 200
+
+# Upper bound (seconds) on any single retry backoff
+MAX_BACKOFF_SECONDS = 30
+
+# HTTP statuses worth retrying (rate limited / gateway timeout)
+RETRY_STATUSES = (429, 504)
+
+# On-disk response cache shared by all Realtor ingests
+CACHE_NAME = ".realtor_cache"
+
+# ============================================================
+# Raw Listing Normalization
+# Maps flattened Realtor JSON paths to the relational schema
+# ============================================================
+
+REALTOR_FIELD_MAP = {
+    "listing_id": "listing_id",
+    "list_price": "list_price",
+    "description.beds": "beds",
+    "description.baths_consolidated": "baths",
+    "description.sqft": "sqft",
+    "list_date": "list_date",
+    "location.address.postal_code": "zip_code",
+    "location.address.coordinate.lat": "latitude",
+    "location.address.coordinate.lon": "longitude",
+    "location.address.line": "address_line",
+    "permalink": "url",
+    "pet_policy.cats": "pet_cats",
+    "pet_policy.dogs": "pet_dogs"
+}
+
+REALTOR_URL_PREFIX = "https://www.realtor.com/rentals/details/"
+
+# Flat schema column order and analytics-safe dtypes; each ingest appends
+# its region enrichment column
+SCHEMA_DTYPES = {
+    "listing_id": "string",
+    "list_price": "Int32",
+    "beds": "float32",
+    "baths": "float32",
+    "sqft": "Int32",
+    "list_date": "datetime64[ns]",
+    "zip_code": "string",
+    "latitude": "float32",
+    "longitude": "float32",
+    "address_line": "string",
+    "url": "string",
+    "pet_cats": "boolean",
+    "pet_dogs": "boolean"
+}
+
+def normalize_listings(data: list) -> pd.DataFrame:
+    """
+    Flatten a page of raw Realtor API listings into a relational schema.
+
+    Uses a single pd.json_normalize traversal instead of building a dict
+    per listing. Nested fields absent from the page are filled with nulls.
+
+    Args:
+        data (list): List of raw property JSON objects.
+
+    Returns:
+        pd.DataFrame: Page-level dataset in flat schema column order.
+    """
+    flat = pd.json_normalize(data, sep=".")
+    df = flat.reindex(columns=list(REALTOR_FIELD_MAP)).rename(columns=REALTOR_FIELD_MAP)
+
+    # Build canonical listing URLs in one vectorized pass
+    df["url"] = REALTOR_URL_PREFIX + df["url"].fillna("")
+
+    return df
+
+# ============================================================
+# Realtor Ingest Driver
+# ============================================================
+
+class RealtorIngest:
+    """
+    Concurrent, deduplicating Realtor ingest for one city.
+
+    Args:
+        table (str): Target table in the raw schema.
+        zip_to_region (dict): ZIP code → region label; keys are the ZIPs queried.
+        region_col (str): Name of the region enrichment column.
+        enrich_from_listing_zip (bool): Look the region up from each listing's
+            own ZIP code instead of assigning the queried ZIP's region.
+        max_retries (int): Number of retry attempts per page.
+        request_interval (float): Minimum spacing (seconds) between requests.
+        max_workers (int): Number of ZIP codes fetched concurrently.
+    """
+
+    def __init__(
+        self,
+        table: str,
+        zip_to_region: dict,
+        region_col: str,
+        enrich_from_listing_zip: bool = False,
+        max_retries: int = 3,
+        request_interval: float = 0.5,
+        max_workers: int = 12
+    ):
+        self.table = table
+        self.zip_to_region = zip_to_region
+        self.region_col = region_col
+        self.enrich_from_listing_zip = enrich_from_listing_zip
+        self.max_retries = max_retries
+        self.max_workers = max_workers
+
+        # Fixed region domain stored as a compact categorical column
+        self.region_dtype = pd.CategoricalDtype(sorted(set(zip_to_region.values())))
+        self.schema_dtypes = {**SCHEMA_DTYPES, region_col: self.region_dtype}
+        self.schema_cols = list(self.schema_dtypes)
+
+        self.session = build_session(CACHE_NAME, RateLimiter(request_interval))
+
+    # --------------------------------------------------------
+    # API Fetching
+    # --------------------------------------------------------
+
+    def fetch_listings(self, zipcode: str, page: int, backoff_factor: int = 2) -> list:
+        """
+        Fetch a single page of rental listings from the Realtor API.
+
+        Implements retry logic with capped exponential backoff to safely
+        recover from rate limits, timeouts, and transient network failures.
+
+        Args:
+            zipcode (str): 5-digit ZIP code to query.
+            page (int): Page number for paginated results.
+            backoff_factor (int): Base of the exponential wait between retries.
+
+        Returns:
+            list: List of raw listing JSON objects.
+        """
+        params = {
+            "location": zipcode,
+            "page": page,
+            "limit": PAGE_LIMIT
+        }
+
+        for attempt in range(1, self.max_retries + 1):
+            wait_time = min(backoff_factor ** attempt, MAX_BACKOFF_SECONDS)
+
+            try:
+                response = self.session.get(BASE_URL, headers=HEADERS, params=params, timeout=20)
+                response.raise_for_status()
+                json_data = orjson.loads(response.content)
+                return json_data.get("properties", [])
+
+            except requests.exceptions.ReadTimeout:
+                print(
+                    f"⏳ Timeout fetching {zipcode} (page {page}). "
+                    f"Retrying in {wait_time}s... (Attempt {attempt}/{self.max_retries})"
+                )
+                time.sleep(wait_time)
+
+            except requests.exceptions.HTTPError as e:
+                status = response.status_code
+                if status in RETRY_STATUSES:
+                    print(
+                        f"⚠️  HTTP {status} for {zipcode} (page {page}). "
+                        f"Waiting {wait_time}s before retry... (Attempt {attempt}/{self.max_retries})"
+                    )
+                    time.sleep(wait_time)
+                    continue
+                else:
+                    print(f"❌ HTTP error {status} for {zipcode} (page {page}): {e}")
+                    return []
+
+            except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
+                print(f"❌ Request failed for {zipcode} (page {page}): {e}")
+                return []
+
+        print(f"❌ Max retries exceeded for {zipcode} (page {page}). Skipping.")
+        return []
+
+    # --------------------------------------------------------
+    # Paginated Page Streaming
+    # --------------------------------------------------------
+
+    def iter_pages(self, zipcode: str):
+        """
+        Lazily fetch and normalize each page of Realtor listings for a ZIP code.
+
+        Only one raw API page is held in memory at a time. Pagination ends on
+        an empty page or when fewer than PAGE_LIMIT listings are returned.
+
+        Args:
+            zipcode (str): 5-digit ZIP code to query.
+
+        Yields:
+            pd.DataFrame: Page-level normalized dataset.
+        """
+        page = 1
+
+        while True:
+            data = self.fetch_listings(zipcode, page)
+            if not data:
+                return
+
+            logger.debug("Fetched %d listings from %s (page %d)", len(data), zipcode, page)
+
+            yield normalize_listings(data)
+
+            # End pagination if fewer than page limit returned
+            if len(data) < PAGE_LIMIT:
+                return
+
+            page += 1
+
+    # --------------------------------------------------------
+    # ZIP-Level Extraction, Cleaning & Region Enrichment
+    # --------------------------------------------------------
+
+    def fetch_and_clean_zip(self, zipcode: str) -> pd.DataFrame:
+        """
+        Fetches all paginated Realtor rental listings for a ZIP code,
+        normalizes the dataset, and applies region enrichment.
+
+        Args:
+            zipcode (str): ZIP code to query.
+
+        Returns:
+            pd.DataFrame: Cleaned ZIP-level dataset.
+        """
+        region = self.zip_to_region[zipcode]
+        pages = list(self.iter_pages(zipcode))
+
+        if not pages:
+            print(f"⚠️  No listings found for {zipcode} ({region}). Skipping.")
+            return pd.DataFrame(columns=self.schema_cols)
+
+        try:
+            df = pd.concat(pages, ignore_index=True)
+
+            # Some numeric fields arrive as mixed strings (e.g. "1+")
+            df["beds"] = clean_numeric_column(df["beds"])
+            df["baths"] = clean_numeric_column(df["baths"])
+
+            # Normalize date fields
+            df["list_date"] = pd.to_datetime(df["list_date"], errors="coerce")
+
+            # Enrich from the listing's own ZIP or from the queried ZIP
+            if self.enrich_from_listing_zip:
+                df[self.region_col] = df["zip_code"].map(self.zip_to_region).astype(self.region_dtype)
+            else:
+                df[self.region_col] = pd.Series(region, index=df.index, dtype=self.region_dtype)
+
+            # Fix column order and dtypes at construction to skip later inference
+            return cast_dtypes(df.reindex(columns=self.schema_cols), self.schema_dtypes)
+
+        except Exception as e:
+            print(f"❌ Unexpected error for {zipcode} ({region}): {e}")
+            return pd.DataFrame(columns=self.schema_cols)
+
+    # --------------------------------------------------------
+    # End-to-End Run
+    # --------------------------------------------------------
+
+    def run(self, engine=None) -> None:
+        """
+        Fetch every configured ZIP code, build the master dataset,
+        and reload the raw table.
+
+        Args:
+            engine: Optional shared SQLAlchemy engine; defaults to create_load_engine().
+
+        Returns:
+            None
+        """
+        setup_queue_logging()
+
+        # Fail fast if the raw table no longer matches the flat schema
+        engine = engine or create_load_engine()
+        check_table_columns(self.table, self.schema_cols, engine=engine)
+
+        # Fetch all ZIP codes concurrently (I/O-bound); map preserves ZIP order
+        zip_codes = list(self.zip_to_region)
+
+        def report(results):
+            for zip_code, df_zip in zip(zip_codes, results):
+                print(f"{self.zip_to_region[zip_code]} - {zip_code}: {len(df_zip)} listings fetched")
+                yield df_zip
+
+        # Deduplicate in ZIP order, as frames arrive (keep-first)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            results = executor.map(self.fetch_and_clean_zip, zip_codes)
+            frames = dedup_frames(report(results))
+
+        # Never reload over the previous snapshot with an empty dataset
+        # (exhausted quota, auth failure, or retries spent on every page)
+        if not frames:
+            raise RuntimeError(f"No listings fetched for any ZIP code; {self.table} left unchanged")
+
+        # Aggregate all ZIP-level datasets into a master DataFrame (single concat)
+        master_df = pd.concat(frames, ignore_index=True, copy=False)
+
+        print(f"Total Listings Fetched: {len(master_df)}")
+
+        # Re-apply analytics-safe data types; a no-op unless a ZIP frame
+        # could not be cast on its own
+        master_df = cast_dtypes(master_df, self.schema_dtypes)
+
+        # ZIP codes compress to a categorical once pooled across frames
+        master_df["zip_code"] = master_df["zip_code"].astype("category")
+
+        # Switch to PyArrow-backed columnar dtypes for faster serialization;
+        # keep float columns float (whole-valued beds/baths must stay REAL)
+        master_df = master_df.convert_dtypes(dtype_backend="pyarrow", convert_integer=False)
+
+        load_dataframe(master_df, self.table, engine=engine)
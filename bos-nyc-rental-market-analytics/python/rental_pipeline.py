@@ -8,7 +8,8 @@ Description:
     Master script for the full Boston & NYC rental market data pipeline. 
     This script coordinates the end-to-end workflow:
 
-    1. Executes all raw ETL scripts (Realtor + Redfin for BOS & NYC)
+    1. Runs all raw ETL ingests (Realtor + Redfin for BOS & NYC) in-process,
+       running the Realtor and Redfin feeds concurrently
     2. Runs all SQL transformation pipelines
     3. Builds unified analytics tables for Power BI consumption
     4. Logs full execution details
@@ -18,7 +19,7 @@ Execution:
     python rental_pipeline.py
 
 Dependencies:
-    - subprocess
+    - sqlalchemy
     - psycopg2
     - sqlparse
     - logging
@@ -30,18 +31,22 @@ Dependencies:
 # ============================================================
 
 import os
+import pickle
+import hashlib
+import importlib
 import datetime
-import subprocess
 import logging
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 
 # ============================================================
 # Third-Party Library Imports
 # ============================================================
 
-import psycopg2
 import sqlparse
+from sqlalchemy import create_engine, text
 from config import settings
+from ingest_common import setup_queue_logging
 
 # ============================================================
 # Repository & Logging Configuration
@@ -60,52 +65,150 @@ logfile = os.path.join(
     f"pipeline_log_{datetime.date.today()}.log"
 )
 
-# Configure global logging format
-logging.basicConfig(
-    filename=logfile,
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s"
-)
+# Configure global logging; records are written by a background listener
+setup_queue_logging(logfile, level=logging.INFO)
 
 # ============================================================
 # PostgreSQL (Supabase) Connection Configuration
 # ============================================================
 
-DB_CONFIG = settings.get_psycopg2_kwargs()
+# One pooled engine shared by every database step of the run
+ENGINE = create_engine(
+    settings.get_sqlalchemy_url(),
+    pool_size=4,
+    pool_pre_ping=True
+)
 
 # ============================================================
-# External Script Execution Utility
+# Ingest Step Execution Utility
 # ============================================================
 
-def run_script(label: str, command: list) -> None:
+def run_step(label: str, module_name: str) -> None:
     """
-    Executes an external Python ETL script using subprocess
-    and logs execution status.
+    Imports an ingest module and runs its main() in-process, logging
+    execution status.
+
+    Sharing one interpreter avoids re-importing pandas, sqlalchemy and
+    requests for every ingest script, and each ingest loads through the
+    shared pooled ENGINE. The import happens inside the try so
+    import-time failures (e.g. a missing API_KEY) are logged and
+    re-raised like any other ingest failure.
 
     Args:
         label (str): Human-readable label for logging.
-        command (list): Command list passed to subprocess.
+        module_name (str): Ingest module exposing main(engine=None); it is
+            called with the shared ENGINE.
 
     Returns:
         None
     """
     try:
         logging.info(f"Starting {label}...")
-        subprocess.run(command, check=True)
+        importlib.import_module(module_name).main(engine=ENGINE)
         logging.info(f"✅ Completed {label}.")
 
-    except subprocess.CalledProcessError as e:
+    except Exception as e:
         logging.error(f"❌ {label} failed: {e}")
         raise
 
+# ============================================================
+# Concurrent Ingestion Lanes
+# ============================================================
+
+# Ingest modules grouped by upstream API. Lanes run concurrently; steps
+# within a lane run in order so each API's rate limit is never shared.
+INGEST_LANES = [
+    [
+        ("Boston Realtor Ingest", "bos_realtor_ingest"),
+        ("NYC Realtor Ingest", "nyc_realtor_ingest"),
+    ],
+    [
+        ("Boston Redfin Ingest", "bos_redfin_ingest"),
+        ("NYC Redfin Ingest", "nyc_redfin_ingest"),
+    ],
+]
+
+def run_lane(steps: list) -> None:
+    """
+    Executes a lane of ingest steps sequentially.
+
+    Args:
+        steps (list): (label, module_name) pairs passed to run_step.
+
+    Returns:
+        None
+    """
+    for label, module_name in steps:
+        run_step(label, module_name)
+
+def run_ingests() -> None:
+    """
+    Runs all ingestion lanes concurrently and re-raises the first failure.
+
+    Returns:
+        None
+    """
+    with ThreadPoolExecutor(max_workers=len(INGEST_LANES)) as executor:
+        futures = [executor.submit(run_lane, lane) for lane in INGEST_LANES]
+
+        for future in futures:
+            future.result()
+
 # ============================================================
 # SQL Execution Utility (Multi-Statement Safe Runner)
 # ============================================================
 
+def _split_sql(sql_path: str) -> list:
+    """
+    Splits a SQL script into statements, caching the result in a pickled
+    sidecar file so sqlparse only re-lexes scripts that have changed.
+
+    The sidecar is keyed on a SHA-256 of the script's contents rather than
+    its mtime, so a script copied in with an older timestamp (cp -p,
+    rsync -a, unzip) is never matched to stale statements.
+
+    Args:
+        sql_path (str): Path to the SQL file.
+
+    Returns:
+        list: SQL statements in file order.
+    """
+    cache_path = sql_path + ".stmts.pkl"
+
+    with open(sql_path, "rb") as f:
+        raw_bytes = f.read()
+    digest = hashlib.sha256(raw_bytes).hexdigest()
+
+    # Reuse the cached split only if it was built from identical contents
+    if os.path.exists(cache_path):
+        try:
+            with open(cache_path, "rb") as f:
+                cached = pickle.load(f)
+            if isinstance(cached, dict) and cached.get("sha256") == digest:
+                return cached["statements"]
+        except (OSError, pickle.UnpicklingError, EOFError):
+            pass
+
+    # Split multi-statement SQL safely
+    statements = sqlparse.split(raw_bytes.decode("utf-8"))
+
+    try:
+        with open(cache_path, "wb") as f:
+            pickle.dump(
+                {"sha256": digest, "statements": statements},
+                f,
+                protocol=pickle.HIGHEST_PROTOCOL
+            )
+    except OSError as e:
+        logging.warning(f"Could not cache statements for {sql_path}: {e}")
+
+    return statements
+
 def execute_sql(sql_path: str, conn) -> None:
     """
     Executes a SQL script file containing one or more statements.
-    Safely parses and executes statements sequentially.
+    Safely parses and executes statements sequentially inside a single
+    transaction, so the whole script commits (or rolls back) once.
 
     Args:
         sql_path (str): Path to the SQL file.
@@ -114,13 +217,11 @@ def execute_sql(sql_path: str, conn) -> None:
     Returns:
         None
     """
-    with open(sql_path, "r", encoding="utf-8") as f:
-        raw_sql = f.read()
-
-    # Split multi-statement SQL safely
-    statements = sqlparse.split(raw_sql)
+    # Split multi-statement SQL safely (cached per file mtime)
+    statements = _split_sql(sql_path)
 
-    with conn.cursor() as cursor:
+    # `with conn` commits on success and rolls back on error
+    with conn, conn.cursor() as cursor:
         for stmt in statements:
             stmt_clean = stmt.strip()
 
@@ -130,7 +231,6 @@ def execute_sql(sql_path: str, conn) -> None:
             try:
                 print(f"\n📄 Executing SQL statement:\n{stmt_clean[:120]}...\n")
                 cursor.execute(stmt_clean)
-                conn.commit()
 
             except Exception as e:
                 conn.rollback()
@@ -156,27 +256,22 @@ def update_status(status: str, details: str = "") -> None:
         None
     """
     try:
-        conn = psycopg2.connect(**DB_CONFIG)
-        cur = conn.cursor()
-
-        # Create status table if it does not exist
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS analytics.pipeline_status (
-                run_timestamp TIMESTAMP PRIMARY KEY DEFAULT NOW(),
-                status TEXT,
-                details TEXT
-            );
-        """)
-
-        # Record current pipeline execution status
-        cur.execute(
-            "INSERT INTO analytics.pipeline_status (status, details) VALUES (%s, %s);",
-            (status, details)
-        )
-
-        conn.commit()
-        cur.close()
-        conn.close()
+        with ENGINE.begin() as conn:
+
+            # Create status table if it does not exist
+            conn.execute(text("""
+                CREATE TABLE IF NOT EXISTS analytics.pipeline_status (
+                    run_timestamp TIMESTAMP PRIMARY KEY DEFAULT NOW(),
+                    status TEXT,
+                    details TEXT
+                );
+            """))
+
+            # Record current pipeline execution status
+            conn.execute(
+                text("INSERT INTO analytics.pipeline_status (status, details) VALUES (:status, :details);"),
+                {"status": status, "details": details}
+            )
 
     except Exception as e:
         logging.error(f"Failed to update pipeline status: {e}")
@@ -191,20 +286,19 @@ if __name__ == "__main__":
 
     try:
         # ----------------------------------------------------
-        # Step 1: Execute All Raw Ingestion ETL Scripts
+        # Step 1: Execute All Raw Ingestion ETL Steps
         # ----------------------------------------------------
 
-        run_script("Boston Realtor Ingest", ["python", "bos_realtor_ingest.py"])
-        run_script("Boston Redfin Ingest", ["python", "bos_redfin_ingest.py"])
-        run_script("NYC Realtor Ingest", ["python", "nyc_realtor_ingest.py"])
-        run_script("NYC Redfin Ingest", ["python", "nyc_redfin_ingest.py"])
+        run_ingests()
 
         # ----------------------------------------------------
         # Step 2: Execute SQL Transformation Pipelines
         # ----------------------------------------------------
 
-        conn = psycopg2.connect(**DB_CONFIG)
-        conn.set_session(autocommit=True)
+        # Check out a pooled connection; autocommit stays off so each
+        # script commits as one transaction
+        pooled = ENGINE.raw_connection()
+        conn = pooled.driver_connection
 
         execute_sql("bos_rental_etl.sql", conn)
         execute_sql("nyc_rental_etl.sql", conn)
@@ -244,7 +338,8 @@ if __name__ == "__main__":
             conn.commit()
             logging.info("✅ Unified listings table successfully created.")
 
-        conn.close()
+        # Return the connection to the shared pool
+        pooled.close()
 
         # ----------------------------------------------------
         # Step 4: Finalize Pipeline Run